@@ -17,6 +17,10 @@ def create_folders():
 # Create .env file
 # ------------------------------
 def create_env():
+    if os.path.exists("project/.env"):
+        print("[=] .env already exists, skipped")
+        return
+
     content = """# PLC CONNECTION SETTINGS
 COMPACTLOGIX_IP=192.168.1.10
 MICROLOGIX_IP=192.168.1.20
@@ -37,9 +41,12 @@ LOG_FILE=plc_logs.log
 # Create tags.xlsx automatically
 # ------------------------------
 def create_tags_excel():
-    wb = openpyxl.Workbook()
-    ws = wb.active
-    ws.title = "TAGS"
+    if os.path.exists("project/tags.xlsx"):
+        print("[=] tags.xlsx already exists, skipped")
+        return
+
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet("TAGS")
 
     ws.append(["TAG_NAME", "PLC_TYPE", "ADDRESS", "DATA_TYPE"])
 
@@ -55,6 +62,10 @@ def create_tags_excel():
 # Create logger file
 # ------------------------------
 def create_log_file():
+    if os.path.exists("project/plc_logs.log"):
+        print("[=] plc_logs.log already exists, skipped")
+        return
+
     open("project/plc_logs.log", "w").close()
     print("[+] plc_logs.log created")
 
@@ -115,7 +126,10 @@ def write_to_sql(data):
     }
 
     for filename, content in readers.items():
-        with open(f"project/readers/{filename}", "w") as f:
+        path = f"project/readers/{filename}"
+        if os.path.exists(path):
+            continue
+        with open(path, "w") as f:
             f.write(content)
 
     print("[+] Reader files created")
@@ -125,6 +139,10 @@ def write_to_sql(data):
 # =====================================================
 
 def create_main():
+    if os.path.exists("project/main.py"):
+        print("[=] main.py already exists, skipped")
+        return
+
     content = """import os
 import time
 from dotenv import load_dotenv
@@ -181,4 +199,5 @@ def generate_project():
     print("\n🎉 Project structure created successfully!")
 
 # Run script
-generate_project()
+if __name__ == "__main__":
+    generate_project()
@@ -1,4 +1,5 @@
 import os
+import functools
 from datetime import datetime
 from pylogix import PLC
 from pycomm3 import SLCDriver
@@ -7,13 +8,11 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
-COL_PLC         = 1
-COL_TAGNAME     = 2
-COL_TAGINDEX    = 3
-COL_TAGTYPE     = 4
-COL_TAGDATATYPE = 5
+# Tag sheet columns, in order: PLC, TagName, TagIndex, TagType, TagDataType
+TAG_SHEET_COLS = 5
 
 
+@functools.lru_cache(maxsize=None)
 def normalize_excel_plc_name(name):
     if not name:
         return None
@@ -70,33 +69,31 @@ def load_excel_tags():
     EXCEL_FILE = os.getenv("EXCEL_FILE_MAIN", "Tagname.xlsx")
     EXCEL_SHEET = os.getenv("EXCEL_SHEET_MAIN", "Sheet1")
 
-    wb = load_workbook(EXCEL_FILE)
-    ws = wb[EXCEL_SHEET]
-
-    tag_map = {}
-    row = 2
-
-    while True:
-        plc_cell = ws.cell(row=row, column=COL_PLC).value
-        tag_cell = ws.cell(row=row, column=COL_TAGNAME).value
-        if not tag_cell:
-            break
-
-        plc_name = normalize_excel_plc_name(plc_cell)
-        tag_name = str(tag_cell).strip()
-
-        if plc_name not in tag_map:
-            tag_map[plc_name] = []
-
-        tag_map[plc_name].append({
-            "row": row,
-            "tag_name": tag_name,
-            "tag_index": ws.cell(row=row, column=COL_TAGINDEX).value,
-            "tag_type": ws.cell(row=row, column=COL_TAGTYPE).value,
-            "tag_dtype": ws.cell(row=row, column=COL_TAGDATATYPE).value,
-        })
-
-        row += 1
+    wb = load_workbook(EXCEL_FILE, read_only=True, data_only=True)
+    try:
+        ws = wb[EXCEL_SHEET]
+        tag_map = {}
+
+        # read_only parses sharedStrings once; iter_rows streams plain values
+        rows = ws.iter_rows(min_row=2, max_col=TAG_SHEET_COLS, values_only=True)
+        for plc_cell, tag_cell, tag_index, tag_type, tag_dtype in rows:
+            if not tag_cell:
+                break
+
+            plc_name = normalize_excel_plc_name(plc_cell)
+            tag_name = str(tag_cell).strip()
+
+            if plc_name not in tag_map:
+                tag_map[plc_name] = []
+
+            tag_map[plc_name].append({
+                "tag_name": tag_name,
+                "tag_index": tag_index,
+                "tag_type": tag_type,
+                "tag_dtype": tag_dtype,
+            })
+    finally:
+        wb.close()
 
     return tag_map
 
@@ -1,10 +1,13 @@
 import os
 import pyodbc
-import pandas as pd
+from openpyxl import load_workbook
 from dotenv import load_dotenv
 
 load_dotenv()
 
+# FloatTable rows fetched / inserted per round-trip
+FETCH_SIZE = 5000
+
 # ===================== SQL CONNECTION =====================
 def get_sql_connection():
     SQL_DRIVER   = os.getenv("SQL_DRIVER")
@@ -31,17 +34,39 @@ def get_sql_connection():
     return pyodbc.connect(conn_str)
 
 
+# ===================== COLUMN DETECTION =====================
+def resolve_columns(columns, col_map, source):
+    """Return {key: position} for each key of col_map, matching normalized header names."""
+    columns = [str(c).strip().lower() for c in columns]
+
+    resolved = {}
+    for key, candidates in col_map.items():
+        matched = None
+        for pos, col in enumerate(columns):
+            if col in candidates:
+                matched = pos
+                break
+        if matched is None:
+            raise Exception(f"❌ Missing {source} column for: {key}")
+        resolved[key] = matched
+    return resolved
+
+
+def to_int(value):
+    return int(value) if value is not None else None
+
+
 # ===================== LOAD TAGMAP FROM EXCEL =====================
 def load_tagmap_from_excel():
+    """Return {TagIndex: (PLC, TagName, TagType, TagDataType)}."""
     excel_file = os.getenv("EXCEL_FILE_MAIN", "Tagname.xlsx")
     excel_sheet = os.getenv("EXCEL_SHEET_MAIN", "Sheet1")
 
     print(f"[+] Loading TagMap from Excel → {excel_file}")
 
-    df = pd.read_excel(excel_file, sheet_name=excel_sheet)
-
-    # Normalize header names
-    df.columns = [str(c).strip().lower() for c in df.columns]
+    wb = load_workbook(excel_file, read_only=True, data_only=True)
+    ws = wb[excel_sheet]
+    rows = ws.iter_rows(values_only=True)
 
     # Flexible column detection
     col_map = {
@@ -51,47 +76,36 @@ def load_tagmap_from_excel():
         "tagtype": ["tagtype", "tag_type", "type"],
         "tagdatatype": ["tagdatatype", "tag_data_type", "datatype"],
     }
+    resolved = resolve_columns(next(rows, ()), col_map, "Excel")
+
+    tagmap = {}
+    for row in rows:
+        tag_index = row[resolved["tagindex"]]
+        if tag_index is None:
+            continue
+        tagmap[int(tag_index)] = (
+            row[resolved["plc"]],
+            row[resolved["tagname"]],
+            to_int(row[resolved["tagtype"]]),
+            to_int(row[resolved["tagdatatype"]]),
+        )
 
-    resolved = {}
-
-    # Resolve real Excel column names
-    for key, candidates in col_map.items():
-        matched = None
-        for col in df.columns:
-            if col in candidates:
-                matched = col
-                break
-        if not matched:
-            raise Exception(f"❌ Missing Excel column for: {key}")
-        resolved[key] = matched
-
-    # Extract required columns only
-    df = df[
-        [resolved["plc"], resolved["tagname"], resolved["tagindex"],
-         resolved["tagtype"], resolved["tagdatatype"]]
-    ]
-
-    # Rename to standard names
-    df.columns = ["PLC", "TagName", "TagIndex", "TagType", "TagDataType"]
+    wb.close()
 
-    print("[+] TagMap Columns Detected:", df.columns.tolist())
-    return df
+    print(f"[+] TagMap entries loaded: {len(tagmap)}")
+    return tagmap
 
 
 
 # ===================== MIGRATE FLOATTABLE → MULTILOG =====================
 def migrate_float_to_multilog():
 
-    conn = get_sql_connection()
+    # FloatTable is streamed on one connection while inserts go over another
+    src_conn = get_sql_connection()
+    dest_conn = get_sql_connection()
 
     print("[+] Loading TagMap from Excel...")
-    tagmap_df = load_tagmap_from_excel()
-
-    print("[+] Reading FloatTable from SQL...")
-    float_df = pd.read_sql("SELECT * FROM dbo.FloatTable", conn)
-
-    # Normalize FloatTable columns
-    float_df.columns = [str(c).strip().lower() for c in float_df.columns]
+    tagmap = load_tagmap_from_excel()
 
     # Expected columns from FloatTable
     float_map = {
@@ -101,48 +115,24 @@ def migrate_float_to_multilog():
         "status": ["status"]
     }
 
-    resolved_float = {}
-    for key, candidates in float_map.items():
-        matched = None
-        for col in float_df.columns:
-            if col in candidates:
-                matched = col
-                break
-        if not matched:
-            raise Exception(f"❌ Missing column in FloatTable for: {key}")
-        resolved_float[key] = matched
-
-    # Rename FloatTable columns
-    float_df = float_df[
-        [resolved_float["readtime"], resolved_float["tagindex"],
-         resolved_float["tagvalue"], resolved_float["status"]]
-    ]
-    float_df.columns = ["ReadTime", "TagIndex", "TagValue", "Status"]
-
-    # Merge with TagMap
-    merged = float_df.merge(tagmap_df, on="TagIndex", how="left")
-
-    # Normalize merged column names
-    merged.columns = [str(c).strip() for c in merged.columns]
-
-    # PLC column may be renamed during merge → detect automatically
-    possible_plc_cols = [c for c in merged.columns if c.upper().startswith("PLC")]
-    if not possible_plc_cols:
-        raise Exception("❌ PLC column missing after merge!")
-
-    plc_col = possible_plc_cols[0]  # Use first match
-
-    # Warn missing PLC
-    missing = merged[merged[plc_col].isna()]
-    if len(missing):
-        print("\n[WARNING] Missing TagIndex mappings in Excel:")
-        print(missing["TagIndex"].unique())
-
-    # Sort by TagIndex
-    merged = merged.sort_values("TagIndex")
+    src_cursor = src_conn.cursor()
+    src_cursor.execute("SELECT TOP 0 * FROM dbo.FloatTable")
+    float_cols = [d[0] for d in src_cursor.description]
+    resolved = resolve_columns(float_cols, float_map, "FloatTable")
+    readtime_col, tagindex_col, tagvalue_col, status_col = (
+        float_cols[resolved[k]] for k in ("readtime", "tagindex", "tagvalue", "status")
+    )
+
+    print("[+] Streaming FloatTable from SQL...")
+    src_cursor.arraysize = FETCH_SIZE
+    src_cursor.execute(
+        f"SELECT [{readtime_col}], [{tagindex_col}], [{tagvalue_col}], [{status_col}] "
+        f"FROM dbo.FloatTable ORDER BY [{tagindex_col}]"
+    )
 
     # Prepare SQL insert
-    cursor = conn.cursor()
+    dest_cursor = dest_conn.cursor()
+    dest_cursor.fast_executemany = True
     SQL_TABLE = os.getenv("SQL_TABLE")
 
     insert_sql = f"""
@@ -153,24 +143,46 @@ def migrate_float_to_multilog():
 
     print("\n[+] Inserting into plc_multi_log...")
 
+    unmapped = (None, None, None, None)
+    missing = set()
     count = 0
-    for _, row in merged.iterrows():
-        cursor.execute(
-            insert_sql,
-            row["ReadTime"],
-            row[plc_col],
-            int(row["TagIndex"]) if pd.notna(row["TagIndex"]) else None,
-            row["TagName"],
-            int(row["TagType"]) if pd.notna(row["TagType"]) else None,
-            int(row["TagDataType"]) if pd.notna(row["TagDataType"]) else None,
-            str(row["TagValue"]) if pd.notna(row["TagValue"]) else None,
-            row["Status"]
-        )
-        count += 1
 
-    conn.commit()
-    cursor.close()
-    conn.close()
+    while True:
+        rows = src_cursor.fetchmany(FETCH_SIZE)
+        if not rows:
+            break
+
+        params = []
+        for read_time, tag_index, tag_value, status in rows:
+            tag_index = to_int(tag_index)
+            plc, tag_name, tag_type, tag_dtype = tagmap.get(tag_index, unmapped)
+            if plc is None:
+                missing.add(tag_index)
+            params.append((
+                read_time,
+                plc,
+                tag_index,
+                tag_name,
+                tag_type,
+                tag_dtype,
+                str(tag_value) if tag_value is not None else None,
+                status
+            ))
+
+        # One batched round-trip per chunk instead of one execute() per row
+        dest_cursor.executemany(insert_sql, params)
+        count += len(params)
+
+    # Warn missing PLC
+    if missing:
+        print("\n[WARNING] Missing TagIndex mappings in Excel:")
+        print(sorted(missing, key=lambda i: (i is None, i)))
+
+    dest_conn.commit()
+    dest_cursor.close()
+    src_cursor.close()
+    dest_conn.close()
+    src_conn.close()
 
     print("\n✔ Migration Completed")
     print(f"✔ Total rows inserted: {count}")
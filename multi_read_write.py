@@ -1,14 +1,24 @@
 import os
+import re
+import atexit
+import functools
+import logging
 import threading
-import subprocess
+import queue
+import signal
+import socket
 import time
 import gc
+import tracemalloc
+from operator import itemgetter
 import sys
-from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FutureTimeout
+from datetime import datetime
+from logging.handlers import TimedRotatingFileHandler
 
 from pylogix import PLC
 from pycomm3 import SLCDriver
-from openpyxl import load_workbook
+from openpyxl import load_workbook, Workbook
 from dotenv import load_dotenv
 import pyodbc
 
@@ -18,62 +28,51 @@ load_dotenv()
 # ===================== LOGGING / LOG ROTATION =====================
 LOG_DIR = "logs"
 LOOP_INTERVAL = int(os.getenv("LOOP_INTERVAL_SEC", "5"))
+SCAN_TIMEOUT  = max(LOOP_INTERVAL - 1, 1)
+GC_INTERVAL   = 3600  # full gc.collect() at most once an hour
+MEMORY_TRACE  = os.getenv("MEMORY_TRACE", "0") == "1"  # hourly tracemalloc top-10
+SQL_BATCH_ROWS = 500  # flush to SQL once this many rows are queued
+SQL_BATCH_WAIT = 0.2  # ... or this many seconds after the first queued row
+SQL_CONNECT_TIMEOUT = 15  # login timeout for pyodbc.connect
+# How long exit waits for the SQL thread to drain before giving up on it
+SQL_STOP_TIMEOUT = 5 * SQL_BATCH_WAIT + SQL_CONNECT_TIMEOUT
 
 if not os.path.isdir(LOG_DIR):
     os.makedirs(LOG_DIR, exist_ok=True)
 
 
-def get_log_file_path():
-    """Return current day's log file path."""
-    today_str = datetime.now().strftime("%Y%m%d")
-    return os.path.join(LOG_DIR, f"plc_reader_{today_str}.log")
+# One handler kept open for the whole run; rotates at midnight, keeps 7 days
+logger = logging.getLogger("plc")
+logger.setLevel(logging.INFO)
+logger.propagate = False
 
+_log_fmt = logging.Formatter("%(asctime)s | %(message)s", datefmt="%Y-%m-%d %H:%M:%S")
 
-def purge_old_logs(days_keep: int = 7):
-    """Keep only last `days_keep` days of log files."""
-    cutoff = datetime.now() - timedelta(days=days_keep)
-    try:
-        for fname in os.listdir(LOG_DIR):
-            if not fname.startswith("plc_reader_") or not fname.endswith(".log"):
-                continue
-            date_str = fname[len("plc_reader_"):-4]  # between prefix and .log
-            try:
-                fdate = datetime.strptime(date_str, "%Y%m%d")
-            except ValueError:
-                continue
-            if fdate < cutoff:
-                full_path = os.path.join(LOG_DIR, fname)
-                os.remove(full_path)
-    except Exception as e:
-        # Log directory issues should never crash the main service
-        print(f"[LOG_PURGE_ERROR] {e}")
-
+_file_handler = TimedRotatingFileHandler(
+    os.path.join(LOG_DIR, "plc_reader.log"),
+    when="midnight",
+    backupCount=7,
+    encoding="utf-8",
+)
+_file_handler.setFormatter(_log_fmt)
+logger.addHandler(_file_handler)
 
-def log(msg: str):
-    ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    line = f"{ts} | {msg}"
-    print(line)
-    try:
-        log_path = get_log_file_path()
-        with open(log_path, "a", encoding="utf-8") as f:
-            f.write(line + "\n")
-    except Exception as e:
-        # logging must never crash the loop
-        print(f"[LOG_WRITE_ERROR] {e}")
+_console_handler = logging.StreamHandler(sys.stdout)
+_console_handler.setFormatter(_log_fmt)
+logger.addHandler(_console_handler)
 
 
 # ===================== CONFIG / EXCEL COLS =====================
-COL_PLC         = 1
-COL_TAGNAME     = 2
-COL_TAGINDEX    = 3
-COL_TAGTYPE     = 4
-COL_TAGDATATYPE = 5
-COL_TAGVALUE    = 6
-COL_STATUS      = 7
-COL_TIMESTAMP   = 8
+# Tag sheet columns, in order: PLC, TagName, TagIndex, TagType, TagDataType
+TAG_SHEET_COLS = 5
+
+LIVE_SHEET   = "Live"
+LIVE_HEADERS = ["PLC", "TagName", "TagIndex", "TagValue", "Status", "Timestamp"]
 
 
 # ===================== HELPER: NORMALIZE PLC NAME =====================
+# Same few PLC names repeat on every tag row, so memoize the result
+@functools.lru_cache(maxsize=None)
 def normalize_plc_name(name):
     if not name:
         return None
@@ -108,7 +107,187 @@ def get_sql_connection():
             f"UID={SQL_USERNAME};PWD={SQL_PASSWORD};"
         )
 
-    return pyodbc.connect(conn_str)
+    return pyodbc.connect(conn_str, timeout=SQL_CONNECT_TIMEOUT)
+
+
+class SQLWriter:
+    """
+    Long-lived SQL connection for the scan loop.
+    Reconnects and retries once if the connection has dropped; if that
+    reconnect fails the writer stays disconnected and the next batch retries.
+    """
+
+    def __init__(self, insert_sql):
+        self.insert_sql = insert_sql
+        self.conn = None
+        self.cursor = None
+        # monotonic time of the first failed batch since the last success
+        self.failing_since = None
+        self._connect()
+
+    def _connect(self):
+        # Only publish conn/cursor once both exist, so a failed connect
+        # leaves the writer cleanly "not connected"
+        conn = get_sql_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.fast_executemany = True
+        except Exception:
+            conn.close()
+            raise
+        self.conn = conn
+        self.cursor = cursor
+
+    def _reconnect(self):
+        self.close()
+        self._connect()
+
+    def insert_many(self, rows):
+        if not rows:
+            return
+        try:
+            if self.conn is None:
+                logger.info("[SQL_RECONNECT] Not connected, connecting")
+                self._connect()
+            try:
+                self._insert(rows)
+            except (pyodbc.OperationalError, pyodbc.InterfaceError) as e:
+                logger.info(f"[SQL_RECONNECT] {e}")
+                self._reconnect()
+                self._insert(rows)
+        except Exception:
+            if self.failing_since is None:
+                self.failing_since = time.monotonic()
+            raise
+        self.failing_since = None
+
+    def _insert(self, rows):
+        # fast_executemany may have inserted part of the batch before failing;
+        # roll that back so a later commit doesn't persist half a batch
+        try:
+            self.cursor.executemany(self.insert_sql, rows)
+            self.commit()
+        except Exception:
+            self.rollback()
+            raise
+
+    def commit(self):
+        self.conn.commit()
+
+    def rollback(self):
+        if self.conn is None:
+            return
+        try:
+            self.conn.rollback()
+        except Exception as e:
+            logger.info(f"[SQL_ROLLBACK_ERROR] {e}")
+
+    def close(self):
+        for obj in (self.cursor, self.conn):
+            if obj is None:
+                continue
+            try:
+                obj.close()
+            except Exception:
+                pass
+        self.cursor = None
+        self.conn = None
+
+
+# Table name is formatted into the INSERT, so only allow [schema.]name
+SQL_TABLE_RE = re.compile(r"^(?:[A-Za-z0-9_]+\.)?[A-Za-z0-9_]+$")
+
+
+def build_insert_sql(table):
+    if not table or not SQL_TABLE_RE.match(table):
+        raise ValueError(f"Invalid SQL_TABLE name: {table!r}")
+    return f"""
+        INSERT INTO {table} (
+            ReadTime, PLC, TagIndex, TagName, TagType, TagDataType, TagValue, Status
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    """
+
+
+# ===================== SQL CONSUMER THREAD =====================
+def format_value(value):
+    """Return (excel_value, value_str); bools are stored as 1/0."""
+    if isinstance(value, bool):
+        excel_value = 1 if value else 0
+        return excel_value, str(excel_value)
+    return value, None if value is None else str(value)
+
+
+def to_sql_rows(now, results):
+    rows = []
+    for r in results:
+        tinfo = r["tag"]
+        _, value_str = format_value(r["value"])
+        rows.append((
+            now,
+            r["plc"],
+            tinfo["tag_index"],
+            tinfo["tag_name"],
+            tinfo["tag_type"],
+            tinfo["tag_dtype"],
+            value_str,
+            r["status"]
+        ))
+    return rows
+
+
+# Queue item telling sql_consumer to flush what it has and exit
+SQL_STOP = object()
+
+
+def flush_sql_rows(writer, rows):
+    try:
+        writer.insert_many(rows)
+    except Exception as e:
+        # SQL problems must not kill the consumer thread
+        logger.info(f"[SQL_ERROR] {len(rows)} rows not inserted → {e}")
+        return
+    for _, plc, tag_index, tag_name, _, _, value_str, status in rows:
+        logger.info(f"[SQL] {plc} | Index={tag_index} | {tag_name}={value_str} | {status}")
+
+
+def sql_consumer(writer, result_q):
+    """
+    Drains lists of SQL rows from result_q into executemany batches.
+    Flushes at SQL_BATCH_ROWS rows, SQL_BATCH_WAIT seconds, or on a None item;
+    flushes and returns on SQL_STOP.
+    """
+    buf = []
+    deadline = None
+    while True:
+        timeout = None if not buf else max(deadline - time.monotonic(), 0)
+        try:
+            rows = result_q.get(timeout=timeout)
+        except queue.Empty:
+            rows = None
+
+        if rows is SQL_STOP:
+            if buf:
+                flush_sql_rows(writer, buf)
+            return
+
+        if rows:
+            if not buf:
+                deadline = time.monotonic() + SQL_BATCH_WAIT
+            buf.extend(rows)
+            if len(buf) < SQL_BATCH_ROWS:
+                continue
+
+        if buf:
+            flush_sql_rows(writer, buf)
+            buf = []
+
+
+# ===================== LIVE EXCEL SNAPSHOT =====================
+def save_live_workbook(wb, path):
+    try:
+        wb.save(path)
+    except Exception as e:
+        logger.info(f"[EXCEL_SAVE_ERROR] {path} → {e}")
 
 
 # ===================== LOAD PLC CONFIG FROM ENV =====================
@@ -134,7 +313,7 @@ def load_plc_config_from_env():
             ip_key = f"PLC_{raw_name}_IP"
             ip_val = os.getenv(ip_key)
             if not ip_val:
-                log(f"[WARN] Missing IP for PLC {raw_name}")
+                logger.info(f"[WARN] Missing IP for PLC {raw_name}")
                 continue
 
             plcs[normalized_name] = {
@@ -142,96 +321,207 @@ def load_plc_config_from_env():
                 "ip": ip_val.strip(),
             }
 
-    log("DEBUG: PLC MAP FROM ENV")
+    logger.info("DEBUG: PLC MAP FROM ENV")
     for name, info in plcs.items():
-        log(f"  {name} => {info}")
+        logger.info(f"  {name} => {info}")
 
     return plcs
 
 
 # ===================== LOAD EXCEL TAG MAP =====================
+# (path, sheet, mtime_ns, size) -> tag_map; reparsed only when the file changes
+_TAGMAP_CACHE = {}
+
+
 def load_excel_tags():
+    """
+    Return the cached tag map, re-reading the sheet only when it changed.
+    If a reload fails (Excel mid-save, file locked, sheet renamed) the last
+    good map is kept; only the very first load is allowed to raise.
+    """
     EXCEL_FILE  = os.getenv("EXCEL_FILE_MAIN")
     EXCEL_SHEET = os.getenv("EXCEL_SHEET_MAIN")
 
-    wb = load_workbook(EXCEL_FILE)
-    ws = wb[EXCEL_SHEET]
+    try:
+        stat = os.stat(EXCEL_FILE)
+        key = (EXCEL_FILE, EXCEL_SHEET, stat.st_mtime_ns, stat.st_size)
+        if key in _TAGMAP_CACHE:
+            return _TAGMAP_CACHE[key]
 
-    tag_map = {}
-    row = 2
+        tag_map = read_tag_sheet(EXCEL_FILE, EXCEL_SHEET)
+    except Exception as e:
+        if not _TAGMAP_CACHE:
+            raise
+        logger.info(f"[TAGMAP_ERROR] Reload of {EXCEL_FILE} failed, keeping last good map → {e}")
+        return next(iter(_TAGMAP_CACHE.values()))
 
-    while True:
-        plc_raw = ws.cell(row=row, column=COL_PLC).value
-        tag_cell = ws.cell(row=row, column=COL_TAGNAME).value
+    if _TAGMAP_CACHE:
+        logger.info(f"[TAGMAP] {EXCEL_FILE} changed, tag map reloaded")
+    _TAGMAP_CACHE.clear()
+    _TAGMAP_CACHE[key] = tag_map
+
+    return tag_map
 
-        if not tag_cell:
-            break
 
-        plc_name = normalize_plc_name(plc_raw)
-        tag_name = str(tag_cell).strip()
+def read_tag_sheet(excel_file, excel_sheet):
+    wb = load_workbook(excel_file, read_only=True, data_only=True)
+    try:
+        ws = wb[excel_sheet]
+        tag_map = {}
+
+        # read_only parses sharedStrings once; iter_rows streams plain values
+        rows = ws.iter_rows(min_row=2, max_col=TAG_SHEET_COLS, values_only=True)
+        for plc_raw, tag_cell, tag_index, tag_type, tag_dtype in rows:
+            if not tag_cell:
+                break
+
+            plc_name = normalize_plc_name(plc_raw)
+            tag_name = str(tag_cell).strip()
+
+            # Excel may hold the index as float/str/blank; store an int (or None)
+            try:
+                tag_index = int(tag_index) if tag_index is not None else None
+            except (TypeError, ValueError):
+                tag_index = None
 
-        if plc_name not in tag_map:
-            tag_map[plc_name] = []
+            if plc_name not in tag_map:
+                tag_map[plc_name] = []
+
+            tag_map[plc_name].append({
+                "tag_name": tag_name,
+                "tag_index": tag_index,
+                "sort_key": -1 if tag_index is None else tag_index,
+                "tag_type": tag_type,
+                "tag_dtype": tag_dtype,
+            })
+    finally:
+        wb.close()
 
-        tag_map[plc_name].append({
-            "row": row,
-            "tag_name": tag_name,
-            "tag_index": ws.cell(row=row, column=COL_TAGINDEX).value,
-            "tag_type": ws.cell(row=row, column=COL_TAGTYPE).value,
-            "tag_dtype": ws.cell(row=row, column=COL_TAGDATATYPE).value,
-        })
+    return tag_map
 
-        row += 1
 
-    return wb, ws, tag_map
+# ===================== PORT CHECK =====================
+# pylogix and SLCDriver both talk EtherNet/IP on 44818
+EIP_PORT = 44818
 
 
-# ===================== PING CHECK =====================
-def ping(ip):
+def port_alive(ip, port=EIP_PORT, timeout=0.2):
+    """TCP-connect probe of the PLC's EtherNet/IP port (no ping subprocess)."""
     try:
-        res = subprocess.run(
-            ["ping", "-n", "1", "-w", "700", ip],
-            capture_output=True,
-            text=True
-        )
-        return "TTL" in res.stdout
-    except Exception as e:
-        log(f"[PING_ERROR] {ip} -> {e}")
+        with socket.create_connection((ip, port), timeout):
+            return True
+    except OSError:
         return False
 
 
+# ===================== PERSISTENT PLC CONNECTIONS =====================
+class PLCClientCache:
+    """
+    Keeps one open driver per PLC across scans.
+    A failed driver is closed and dropped; the next read reconnects lazily.
+    Each entry has its own lock since PLC workers run concurrently.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}
+
+    def entry(self, plc_name):
+        with self._lock:
+            if plc_name not in self._entries:
+                self._entries[plc_name] = {
+                    "driver": None,
+                    "close": None,
+                    "last_error_ts": None,
+                    "lock": threading.Lock(),
+                }
+            return self._entries[plc_name]
+
+    def store(self, entry, driver, close):
+        """Cache an open driver with its close callable (pylogix: Close, pycomm3: close)."""
+        entry["driver"] = driver
+        entry["close"] = close
+
+    def drop(self, entry):
+        close = entry["close"]
+        entry["driver"] = None
+        entry["close"] = None
+        entry["last_error_ts"] = time.time()
+        if close is not None:
+            try:
+                close()
+            except Exception as e:
+                logger.info(f"[PLC_CLOSE_ERROR] {e}")
+
+    def close_all(self):
+        with self._lock:
+            entries = list(self._entries.values())
+        for entry in entries:
+            with entry["lock"]:
+                self.drop(entry)
+
+
+PLC_CLIENTS = PLCClientCache()
+atexit.register(PLC_CLIENTS.close_all)
+
+
+# ===================== READ CHUNKING =====================
+# pylogix already splits a multi-tag Read() by its ConnectionSize, so only
+# MicroLogix reads are capped here
+MICROLOGIX_CHUNK_TAGS = 20
+
+
+def chunk_micrologix_tags(tag_list, max_tags=MICROLOGIX_CHUNK_TAGS):
+    for i in range(0, len(tag_list), max_tags):
+        yield tag_list[i:i + max_tags]
+
+
 # ===================== MICROLOGIX READER =====================
-def read_micro_logix(ip, tag_list, retries=3):
-    for attempt in range(retries):
-        try:
-            with SLCDriver(ip) as plc:
-                addrs = [t["tag_name"] for t in tag_list]
-                resp = plc.read(*addrs)
-                resp_list = resp if isinstance(resp, list) else [resp]
+def read_micro_logix(plc_name, ip, tag_list, retries=3):
+    entry = PLC_CLIENTS.entry(plc_name)
+    with entry["lock"]:
+        for attempt in range(retries):
+            try:
+                plc = entry["driver"]
+                if plc is None:
+                    plc = SLCDriver(ip)
+                    plc.open()
+                    PLC_CLIENTS.store(entry, plc, plc.close)
 
                 results = []
-                for r, t in zip(resp_list, tag_list):
-                    results.append({
-                        "value": r.value,
-                        "status": "OK" if not r.error else str(r.error),
-                        "tag": t
-                    })
+                for chunk in chunk_micrologix_tags(tag_list):
+                    addrs = [t["tag_name"] for t in chunk]
+                    resp = plc.read(*addrs)
+                    resp_list = resp if isinstance(resp, list) else [resp]
+
+                    for r, t in zip(resp_list, chunk):
+                        results.append({
+                            "value": r.value,
+                            "status": "OK" if not r.error else str(r.error),
+                            "tag": t
+                        })
                 return results
-        except Exception as e:
-            log(f"[ERROR][MicroLogix {ip}] Attempt {attempt+1}/{retries} → {e}")
-            time.sleep(0.2)
+            except Exception as e:
+                logger.info(f"[ERROR][MicroLogix {ip}] Attempt {attempt+1}/{retries} → {e}")
+                PLC_CLIENTS.drop(entry)
+                time.sleep(0.2)
 
     # If all retries failed:
     return [{"value": None, "status": "NO RESPONSE", "tag": t} for t in tag_list]
 
 
 # ===================== LOGIX READER (Compact / Micro800) =====================
-def read_logix(ip, tag_list, is_micro800, retries=3):
-    for attempt in range(retries):
-        try:
-            with PLC() as comm:
-                comm.IPAddress = ip
-                comm.Micro800 = is_micro800
+def read_logix(plc_name, ip, tag_list, is_micro800, retries=3):
+    entry = PLC_CLIENTS.entry(plc_name)
+    with entry["lock"]:
+        for attempt in range(retries):
+            try:
+                comm = entry["driver"]
+                if comm is None:
+                    comm = PLC()
+                    comm.IPAddress = ip
+                    comm.Micro800 = is_micro800
+                    PLC_CLIENTS.store(entry, comm, comm.Close)
 
                 tags = [t["tag_name"] for t in tag_list]
                 resp_list = comm.Read(tags)
@@ -245,155 +535,211 @@ def read_logix(ip, tag_list, is_micro800, retries=3):
                     })
                 return results
 
-        except Exception as e:
-            log(f"[ERROR][Logix {ip}] Attempt {attempt+1}/{retries} → {e}")
-            time.sleep(0.2)
+            except Exception as e:
+                logger.info(f"[ERROR][Logix {ip}] Attempt {attempt+1}/{retries} → {e}")
+                PLC_CLIENTS.drop(entry)
+                time.sleep(0.2)
 
     return [{"value": None, "status": "NO RESPONSE", "tag": t} for t in tag_list]
 
 
 # ===================== THREAD WORKER =====================
-def plc_worker(plc_name, plc_info, tag_list, result_bucket):
+def status_results(plc_name, tag_list, status):
+    """Placeholder results (no value) for a PLC that was not read this scan."""
+    return [
+        {"plc": plc_name, "value": None, "status": status, "tag": t, "_k": t["sort_key"]}
+        for t in tag_list
+    ]
+
+
+def plc_worker(plc_name, plc_info, tag_list):
+    """Read one PLC and return its results; runs on the PLC thread pool."""
     ip = plc_info["ip"]
     plc_type = plc_info["type"]
 
-    if not ping(ip):
-        log(f"[OFFLINE] PLC {plc_name} @ {ip} not pinging. Skipping safely.")
-        for t in tag_list:
-            result_bucket.append({
-                "plc": plc_name,
-                "value": None,
-                "status": "OFFLINE",
-                "tag": t
-            })
-        return
+    if not port_alive(ip):
+        logger.info(f"[OFFLINE] PLC {plc_name} @ {ip}:{EIP_PORT} not reachable. Skipping safely.")
+        return status_results(plc_name, tag_list, "OFFLINE")
 
     if plc_type == "MICROLOGIX":
-        results = read_micro_logix(ip, tag_list)
+        results = read_micro_logix(plc_name, ip, tag_list)
     else:
-        results = read_logix(ip, tag_list, is_micro800=(plc_type == "MICRO800"))
+        results = read_logix(plc_name, ip, tag_list, is_micro800=(plc_type == "MICRO800"))
 
     for r in results:
         r["plc"] = plc_name
-        result_bucket.append(r)
+        r["_k"] = r["tag"]["sort_key"]
+    return results
 
 
-# ===================== MAIN LOOP WITH DAILY RESTART =====================
+# ===================== MAIN LOOP =====================
 def main_loop():
     plcs = load_plc_config_from_env()
-    wb, ws, tag_map = load_excel_tags()
     SQL_TABLE = os.getenv("SQL_TABLE")
+    OUT_FILE  = os.getenv("EXCEL_FILE_LIVE", "tags_with_values.xlsx")
+
+    # Built once for the whole run; the table name is validated here
+    insert_sql = build_insert_sql(SQL_TABLE)
+    writer = SQLWriter(insert_sql)
+
+    # SQL inserts run on their own thread while slower PLCs are still reading
+    result_q = queue.Queue()
+    sql_thread = threading.Thread(
+        target=sql_consumer, args=(writer, result_q), name="sql", daemon=True
+    )
+    sql_thread.start()
+
+    def stop_sql_consumer():
+        # Insert everything still queued before the connection is closed,
+        # but never let a hung SQL call block the service from stopping
+        result_q.put(SQL_STOP)
+        sql_thread.join(timeout=SQL_STOP_TIMEOUT)
+        if sql_thread.is_alive():
+            abandoned = 0
+            while True:
+                try:
+                    rows = result_q.get_nowait()
+                except queue.Empty:
+                    break
+                if rows and rows is not SQL_STOP:
+                    abandoned += len(rows)
+            logger.info(
+                f"[SQL_STOP] SQL thread still busy after {SQL_STOP_TIMEOUT:.0f}s; "
+                f"{abandoned} queued rows abandoned (plus any batch in progress)"
+            )
+        writer.close()
 
-    last_restart_date = None
+    atexit.register(stop_sql_consumer)
+    # SIGTERM (service stop) exits through atexit like Ctrl+C does
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
 
-    while True:
-        # --------- Daily Restart Check (2 AM) ----------
-        now_check = datetime.now()
-        if (
-            now_check.hour == 2
-            and now_check.minute == 0
-            and (last_restart_date is None or last_restart_date != now_check.date())
-        ):
-            log("Daily scheduled restart at 02:00 triggered.")
-            # Flush logs & GC before restart
-            gc.collect()
-            last_restart_date = now_check.date()
-            # re-exec this script in-place
-            python = sys.executable
-            os.execv(python, [python] + sys.argv)
+    # Excel snapshot is serialized in the background while the next scan starts
+    save_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="xlsx")
+    atexit.register(save_pool.shutdown, wait=True)
+
+    # One long-lived pool for all scans instead of a thread per PLC per scan
+    plc_pool = ThreadPoolExecutor(max_workers=max(4, len(plcs)), thread_name_prefix="plc")
+    atexit.register(plc_pool.shutdown, wait=False)
+    # plc_name -> last submitted future; a PLC is never read twice at once
+    inflight = {}
 
-        # --------- Purge Old Logs (keep last 7 days) ----------
-        purge_old_logs(days_keep=7)
+    # Fewer automatic collections; the tag map and pools live for the whole run
+    gc.set_threshold(50000, 10, 10)
+    last_gc_ts = time.monotonic()
 
+    # No daily re-exec any more; set MEMORY_TRACE=1 to find a leak instead
+    if MEMORY_TRACE:
+        tracemalloc.start()
+
+    while True:
         # --------- Start New Scan ----------
         now = datetime.now()
         ts = now.strftime("%Y-%m-%d %H:%M:%S")
-        log("========== NEW SCAN ==========")
-
-        conn = get_sql_connection()
-        cursor = conn.cursor()
+        logger.info("========== NEW SCAN ==========")
 
-        insert_sql = f"""
-            INSERT INTO {SQL_TABLE} (
-                ReadTime, PLC, TagIndex, TagName, TagType, TagDataType, TagValue, Status
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        """
+        # Cached until Tagname.xlsx is modified, so edits apply without restart
+        tag_map = load_excel_tags()
 
-        all_results = []
-        threads = []
+        futures = {}
+        busy = []
+        total_tags = 0
 
-        # ---- Spawn PLC Threads ----
+        # ---- Submit PLC Reads (each PLC owns a fixed slice of all_results) ----
         for plc_name, plc_info in plcs.items():
             if plc_name not in tag_map:
-                log(f"[SKIP] No tags configured for {plc_name}")
+                logger.info(f"[SKIP] No tags configured for {plc_name}")
                 continue
 
-            t = threading.Thread(
-                target=plc_worker,
-                args=(plc_name, plc_info, tag_map[plc_name], all_results),
-                daemon=True,
-            )
-            t.start()
-            threads.append(t)
+            tag_list = tag_map[plc_name]
+            slot = (plc_name, total_tags, len(tag_list))
+            total_tags += len(tag_list)
+
+            # A read that timed out earlier still holds the PLC's lock and a
+            # pool thread; queueing another behind it would starve the pool
+            prev = inflight.get(plc_name)
+            if prev is not None and not prev.done():
+                logger.info(f"[BUSY] PLC {plc_name} still busy with an earlier read. Skipping this scan.")
+                busy.append(slot)
+                continue
+
+            fut = plc_pool.submit(plc_worker, plc_name, plc_info, tag_list)
+            inflight[plc_name] = fut
+            futures[fut] = slot
+
+        all_results = [None] * total_tags
+        has_gaps = False
+
+        for plc_name, start, n in busy:
+            results = status_results(plc_name, tag_map[plc_name], "BUSY")
+            result_q.put(to_sql_rows(now, results))
+            all_results[start:start + n] = results
 
-        # ---- Wait for all PLCs to complete ----
-        for t in threads:
-            t.join()
+        # ---- Collect PLC results as they complete (main thread only) ----
+        pending = dict(futures)
+        try:
+            for fut in as_completed(futures, timeout=SCAN_TIMEOUT):
+                plc_name, start, n = pending.pop(fut)
+                try:
+                    results = fut.result()
+                except Exception as e:
+                    logger.info(f"[ERROR][Worker {plc_name}] {e}")
+                    has_gaps = True
+                    continue
+                result_q.put(to_sql_rows(now, results))
+                if len(results) != n:
+                    has_gaps = True
+                    results = (results + [None] * n)[:n]
+                all_results[start:start + n] = results
+        except FutureTimeout:
+            for fut, (plc_name, start, n) in pending.items():
+                fut.cancel()
+                logger.info(f"[TIMEOUT] PLC {plc_name} did not finish within {SCAN_TIMEOUT}s")
+                results = status_results(plc_name, tag_map[plc_name], "TIMEOUT")
+                result_q.put(to_sql_rows(now, results))
+                all_results[start:start + n] = results
+
+        if has_gaps:
+            all_results = [r for r in all_results if r is not None]
+
+        # ---- Flush whatever this scan left in the SQL queue ----
+        result_q.put(None)
 
         # ---- Sort by TagIndex ----
-        all_results = sorted(all_results, key=lambda r: r["tag"]["tag_index"])
+        all_results.sort(key=itemgetter("_k"))
 
-        # ---- Write SQL + Excel ----
-        for r in all_results:
-            plc_name = r["plc"]
-            tinfo    = r["tag"]
-            value    = r["value"]
-            status   = r["status"]
-
-            tag_name  = tinfo["tag_name"]
-            tag_index = tinfo["tag_index"]
-            tag_type  = tinfo["tag_type"]
-            tag_dtype = tinfo["tag_dtype"]
-
-            if isinstance(value, bool):
-                excel_value = 1 if value else 0
-                value_str = str(excel_value)
-            else:
-                excel_value = value
-                value_str = None if value is None else str(value)
-
-            row = tinfo["row"]
-            ws.cell(row=row, column=COL_TAGVALUE).value   = excel_value
-            ws.cell(row=row, column=COL_STATUS).value     = status
-            ws.cell(row=row, column=COL_TIMESTAMP).value  = ts
-
-            cursor.execute(
-                insert_sql,
-                now,
-                plc_name,
-                tag_index,
-                tag_name,
-                tag_type,
-                tag_dtype,
-                value_str,
-                status
-            )
+        # ---- Live values snapshot (streamed, rebuilt every scan) ----
+        out_wb = Workbook(write_only=True)
+        out_ws = out_wb.create_sheet(LIVE_SHEET)
+        out_ws.append(LIVE_HEADERS)
 
-            log(f"[SQL] {plc_name} | Index={tag_index} | {tag_name}={value_str} | {status}")
+        for r in all_results:
+            tinfo = r["tag"]
+            excel_value, _ = format_value(r["value"])
+            out_ws.append([r["plc"], tinfo["tag_name"], tinfo["tag_index"], excel_value, r["status"], ts])
 
-        conn.commit()
-        cursor.close()
-        conn.close()
+        save_pool.submit(save_live_workbook, out_wb, OUT_FILE)
 
-        wb.save(os.getenv("EXCEL_FILE_MAIN"))
+        logger.info("========== SCAN COMPLETE ==========")
 
-        log("========== SCAN COMPLETE ==========")
+        # No restart recovers a dead SQL link any more, so say so every scan
+        failing_since = writer.failing_since
+        if failing_since is not None:
+            logger.info(
+                f"[SQL_DOWN] SQL inserts failing for {int(time.monotonic() - failing_since)}s; "
+                "retrying each batch, failed rows are not stored"
+            )
 
-        # --------- Cleanup & Garbage Collection ----------
+        # --------- Cleanup & Garbage Collection (hourly) ----------
         del all_results
-        del threads
-        gc.collect()
-        log("[GC] Garbage collection complete")
+        del futures
+        if time.monotonic() - last_gc_ts >= GC_INTERVAL:
+            gc.collect()
+            last_gc_ts = time.monotonic()
+            logger.info("[GC] Hourly garbage collection complete")
+
+            if MEMORY_TRACE:
+                for stat in tracemalloc.take_snapshot().statistics("lineno")[:10]:
+                    logger.info(f"[MEM] {stat}")
 
         time.sleep(LOOP_INTERVAL)
 